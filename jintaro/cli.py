@@ -4,19 +4,22 @@ import argparse
 import logging
 import sys
 import traceback
+from typing import List
 
 from . import __version__ as jintaro_version
-from .exceptions import ConfigValueError
-from .jintaro import Jintaro
 from .log import configure_root_logger, log
 
 
-def main():
-    # parse arguments
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="jintaro",
         description="Versatile batch templating, using Jinja2 templates and " \
                     "a spreadsheet format of your choice (xlsx, ods, csv)",
+        epilog="Arguments can also be read from a file by passing '@path/to/file', " \
+               "one argument per line. Every argument starting with '@' is read as such " \
+               "a file, option values too (e.g. '-i @data.csv'), prefix a path like " \
+               "that with './' to pass it as is.",
+        fromfile_prefix_chars="@",
         add_help=False,
     )
     general_options = parser.add_argument_group(title="general options")
@@ -125,6 +128,14 @@ def main():
         default=None,
         help="First row/column of the input file(s), that contains the header (format: 0,0)",
     )
+    config_options.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of processes rendering the templates in parallel (default: 1)",
+    )
     config_options.add_argument(
         "-e",
         "--extra-vars",
@@ -134,64 +145,87 @@ def main():
         nargs='*',
         help="Extra variables used for templating (format: key=value)",
     )
-    args = parser.parse_args(sys.argv[1:])
+    return parser
+
+
+# log levels selected by the number of '-v' flags
+_LOG_LEVELS = ("WARNING", "V", "VV", "VVV", "DEBUG")
+
+# options that are passed on as is to the Jintaro method of the same name
+_CONFIG_OPTIONS = (
+    "config",
+    "input",
+    "template",
+    "output",
+    "force",
+    "delete",
+    "pre_hook",
+    "post_hook",
+    "skip",
+    "jobs",
+    "continue_on_error",
+)
+
+# the parser is built on first use and then reused, so that repeated in-process
+# invocations of main() don't have to re-create all the argument definitions
+_PARSER = None
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    global _PARSER  #pylint: disable=global-statement
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER.parse_args(argv)
+
+
+def main() -> int:
+    # parse arguments
+    args = _parse_args(sys.argv[1:])
+
+    # import the heavy lifting parts only after the arguments have been parsed,
+    # so that '--help' and '--version' don't need to load Jinja2 and pyexcel
+    from .exceptions import ConfigValueError  #pylint: disable=import-outside-toplevel
+    from .jintaro import Jintaro  #pylint: disable=import-outside-toplevel
 
     # initialize logger
-    levels = ["WARNING", "V", "VV", "VVV", "DEBUG"]
-    configure_root_logger(levels[min(len(levels), args.verbose)])
+    configure_root_logger(_LOG_LEVELS[min(args.verbose, len(_LOG_LEVELS) - 1)])
 
     try:
         jintaro = Jintaro()
 
         # apply user config
-        if args.config:
-            jintaro.config(args.config)
-        if args.input:
-            jintaro.input(args.input)
-        if args.template:
-            jintaro.template(args.template)
-        if args.output:
-            jintaro.output(args.output)
-        if args.force is not None:
-            jintaro.force(args.force)
-        if args.delete is not None:
-            jintaro.delete(args.delete)
-        if args.pre_hook:
-            jintaro.pre_hook(args.pre_hook)
-        if args.post_hook:
-            jintaro.post_hook(args.post_hook)
-        if args.skip:
-            jintaro.skip(args.skip)
+        for option in _CONFIG_OPTIONS:
+            value = getattr(args, option)
+            if value is not None:
+                getattr(jintaro, option)(value)
         if args.header_row_column:
-            jintaro.header_row_column(args.header_row_column)
+            row, _, column = args.header_row_column.partition(",")
+            try:
+                jintaro.header_row_column(int(row or 0), int(column or 0))
+            except ValueError as ex:
+                raise ConfigValueError("Header row and column must be specified as numbers: 'row,column'") from ex
         if args.extra_vars:
-            vars_ = {}
-            for key_value in args.extra_values:
-                key_value = key_value.split("=", 1)
-                if len(key_value) != 2:
-                    raise ConfigValueError("Extra vars must be specified as key-value pairs: 'key=value'")
-                vars_[key_value[0]] = key_value[1]
-            jintaro.extra_vars(vars_)
-        if args.continue_on_error:
-            jintaro.continue_on_error(args.continue_on_error)
+            pairs = [key_value.partition("=") for key_value in args.extra_vars]
+            invalid = [key + sep + value for key, sep, value in pairs if not sep]
+            if invalid:
+                raise ConfigValueError("Extra vars must be specified as key-value pairs: 'key=value' " \
+                                       f"(invalid: {', '.join(invalid)})")
+            jintaro.extra_vars({key: value for key, _, value in pairs})
 
         # render the templates
         jintaro.run()
 
     except KeyboardInterrupt:
         log.v("Interrupted by user, Exiting...")
-        sys.exit(1)
+        return 1
     except Exception as e:  #pylint: disable=broad-except
         # catch errors and print to stderr
-        if logging.root.level <= logging.DEBUG:
-            log.error(traceback.format_exc())
-        else:
-            log.error(str(e))
-        sys.exit(1)
+        log.error(traceback.format_exc() if log.isEnabledFor(logging.DEBUG) else str(e))
+        return 1
 
     log.v("Jintaro finished, exiting now...")
-    sys.exit(0)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
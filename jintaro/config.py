@@ -1,19 +1,81 @@
 import os
-from distutils.util import strtobool
+import sys
+from collections import ChainMap
+from copy import copy, deepcopy
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional, Union
+from types import MappingProxyType
+from typing import (Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union)
 
 import yaml
 from cerberus import TypeDefinition, Validator
-from cerberus.errors import REQUIRED_FIELD, BasicErrorHandler, ValidationError
+from cerberus.errors import (BAD_TYPE, COERCION_FAILED, REQUIRED_FIELD, BasicErrorHandler, ValidationError)
 
 from .exceptions import ConfigError, UnknownOptionError
 from .log import log
-from .utils import read_file
+from .utils import str_to_bool
+
+try:
+    # use the libyaml based loader if available
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 # represents a missing option
 missing = type("MissingType", (), {"__repr__": lambda x: "missing"})()
 
+# start delimiters of Jinja2 statements, expressions and comments
+_JINJA_START_MARKERS = ("{%", "{{", "{#")
+
+# parsed YAML config files by (path, mtime, size)
+_yaml_cache: Dict[Tuple[str, int, int], Any] = {}
+
+
+@lru_cache(maxsize=256)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a dotted option path into its keys."""
+    # interned keys are mostly matched by identity in the dict lookups
+    return tuple(map(sys.intern, path.split(".")))
+
+
+@lru_cache(maxsize=1)
+def _jintaro_environment() -> Dict[str, str]:
+    """Return a snapshot of the JINTARO_* environment variables."""
+    # look up the known variables instead of scanning the whole environment
+    return {k: os.environ[k] for k in _ENV_OPTIONS if k in os.environ}
+
+
+def _row_column_from_str(val: str) -> List[int]:
+    row, _, column = val.partition(",")
+    row, column = row.strip(), column.strip()
+    return [int(row) if row else 0, int(column) if column else 0]
+
+
+def _row_column_from_number(val: Union[int, float]) -> List[int]:
+    return [int(val), 0]
+
+
+def _row_column_from_sequence(val: Union[List[int], Tuple[int, ...]]) -> List[int]:
+    return [int(val[0]) if val else 0, int(val[1]) if len(val) > 1 else 0]
+
+
+# parsers of the header row and column by the type of the given value
+_ROW_COLUMN_PARSERS = {
+    str: _row_column_from_str,
+    int: _row_column_from_number,
+    bool: _row_column_from_number,
+    float: _row_column_from_number,
+    list: _row_column_from_sequence,
+    tuple: _row_column_from_sequence,
+}
+
+
+def clear_env_cache() -> None:
+    """Forget the snapshot of the environment variables, so that changes made
+    after the first config has been loaded are picked up."""
+    _jintaro_environment.cache_clear()
+
 
 class ConfigValidator(Validator):
 
@@ -24,14 +86,21 @@ class ConfigValidator(Validator):
 
         def _format_errors(self, errors: List[ValidationError]) -> List[Dict[str, Union[str, int, List[str]]]]:
             formatted_errors = []
-            for error in errors:
-                if error.is_logic_error:
-                    for definition_errors in error.definitions_errors.values():
-                        formatted_errors.extend(self._format_errors(definition_errors))
+            # walk the error tree depth-first, keeping the order of the errors
+            stack = [iter(errors)]
+            while stack:
+                error = next(stack[-1], None)
+                if error is None:
+                    stack.pop()
+                elif error.is_logic_error:
+                    stack.append(chain.from_iterable(error.definitions_errors.values()))
                 elif error.is_group_error:
-                    formatted_errors.extend(self._format_errors(error.child_errors))
+                    stack.append(iter(error.child_errors))
                 elif error.code in self.messages:
-                    formatted_errors.append(self._format_error(error))
+                    formatted_error = self._format_error(error)
+                    # the same error may be reported by several rules
+                    if formatted_error not in formatted_errors:
+                        formatted_errors.append(formatted_error)
 
             return formatted_errors
 
@@ -46,296 +115,329 @@ class ConfigValidator(Validator):
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
         self.purge_unknown = True
-        self.error_handler = self.FlatErrorHandler()
         self.types_mapping['path'] = TypeDefinition('path', (Path,), ())
 
+    @property
+    def flat_errors(self) -> List[Dict[str, Union[str, int, List[str]]]]:
+        """The errors of the last validation as a flat list.
+
+        The errors are only formatted on demand, so successful validations
+        don't pay for the custom error handler.
+        """
+        return self.FlatErrorHandler()(self._errors)
+
     @staticmethod
     def _normalize_purge_unknown(mapping: Mapping, schema: Mapping):
         """ {'type': 'boolean'} """
-        for field in [x for x in mapping if x not in schema]:
-            log.warning("Unknown option '%s' in configuration file", field)
-            mapping.pop(field)
+        unknown = mapping.keys() - schema.keys()
+        if unknown:
+            log.warning("Ignoring unknown option(s) in configuration: %s", ", ".join(sorted(map(str, unknown))))
+            for field in unknown:
+                del mapping[field]
         return mapping
 
+    def _check_with_jinja_template(self, field: str, value: Any) -> None:
+        # a value without any brace can't contain a marker, skip the substring scans
+        if isinstance(value, str) and ("{" not in value or not any(marker in value for marker in _JINJA_START_MARKERS)):
+            self._error(field, "must contain a Jinja2 statement, expression or comment")
+
     def _normalize_default(self, mapping: Mapping, schema: Mapping, field: str) -> None:
         """ {'nullable': True} """
-        value = schema[field]['default']
-        if value is missing:
-            self._error(field, REQUIRED_FIELD)
-        else:
-            mapping[field] = schema[field]['default']
+        # the schema is shared, don't hand out its mutable defaults
+        mapping[field] = copy(schema[field]['default'])
 
 
 class ConfigSource:
 
+    __slots__ = ("_config", "_schema", "_flat")
+
+    # compiled validators by schema id; the schema is kept alongside to make sure
+    # the id isn't reused by another object
+    _validators: Dict[int, Tuple[Mapping, ConfigValidator]] = {}
+
     def __init__(self):
         super().__init__()
         self._config = {}
         self._schema = {}
+        # validated options by their dotted path
+        self._flat = None
         self._init_schema()
 
     def get(self, path: str, default: Any = missing) -> Any:
         assert isinstance(path, str) and len(path) > 0
 
+        if self._flat is not None:
+            value = self._flat.get(path, missing)
+            if value is not missing:
+                return value
+
         value = self._config
-        for key in path.split('.'):
-            if isinstance(value, dict):
-                if key in value:
-                    value = value[key]
-                elif default is not missing:
-                    return default
-                else:
-                    raise UnknownOptionError(f"No such option '{path}' in the configuration")
+        # most options are top-level ones, which don't need to be split
+        for key in _split_path(path) if "." in path else (path,):
+            if type(value) is dict:  #pylint: disable=unidiomatic-typecheck
+                value = value.get(key, missing)
             else:
-                if hasattr(value, key):
-                    value = getattr(value, key)
-                elif default is not missing:
+                value = getattr(value, key, missing)
+            if value is missing:
+                if default is not missing:
                     return default
-                else:
-                    raise UnknownOptionError(f"No such option '{path}' in the configuration")
+                raise UnknownOptionError(path)
         return value
 
     def set(self, path: str, value: Any) -> None:
         assert isinstance(path, str) and len(path) > 0
 
-        full_path = path.split('.')
-        parent = full_path[:-1]
-        key = full_path[-1]
+        *parent, key = _split_path(path)
 
         last_branch = self._config
         for p in parent:
-            if not (p in last_branch and isinstance(last_branch[p], dict)):
-                last_branch[p] = {}
-            last_branch = last_branch[p]
+            branch = last_branch.get(p)
+            if not isinstance(branch, dict):
+                branch = last_branch[p] = {}
+            last_branch = branch
 
         last_branch[key] = value
+        self._flat = None
 
     def _validate(self) -> None:
         if self._schema:
-            validator = ConfigValidator(self._schema)
+            validator = self._get_validator(self._schema)
             if not validator.validate(self._config):
-                errors = validator.errors
-                for error in errors:
-                    path = ".".join(error["path"])
-                    if error['code'] == 0x02:
-                        log.error("Configuration is missing the option '%s'. " \
-                            "Make sure to supply the option either via configuration, "\
-                            "environment variable or command line argument", path)
-                    else:
-                        log.error("Configuration contains an invalid option '%s': %s", path, error['msg'])
-                raise ConfigError(
-                    "There is one or more errors in the configuration. Check the following options: {}".format(
-                        ", ".join([err["path"] for err in errors])))
+                self._raise_errors(validator.flat_errors)
 
             self._config = validator.document
+            self._flat = self._flatten(self._config)
+
+    def _coerce(self, options: Mapping[str, "_Option"]) -> None:
+        """Coerce and type check the options of a source, that doesn't need to
+        be validated against a full schema. Unknown options are dropped."""
+        if not self._config:
+            self._flat = {}
+            return
+
+        unknown = self._config.keys() - options.keys()
+        if unknown:
+            log.warning("Ignoring unknown option(s) in configuration: %s", ", ".join(sorted(map(str, unknown))))
+            for option in unknown:
+                del self._config[option]
+
+        errors = []
+        for option, value in self._config.items():
+            rule = options[option]
+            if value is None:
+                continue
+            if rule.coerce is not None and isinstance(value, rule.coerce_from):
+                try:
+                    value = rule.coerce(value)
+                except (TypeError, ValueError) as ex:
+                    errors.append({
+                        "path": [option],
+                        "code": COERCION_FAILED.code,
+                        "msg": f"field '{option}' cannot be coerced: {ex}",
+                    })
+                    continue
+            if rule.types is not None and not isinstance(value, rule.types):
+                errors.append({
+                    "path": [option],
+                    "code": BAD_TYPE.code,
+                    "msg": f"must be of {rule.types.__name__} type",
+                })
+                continue
+            self._config[option] = value
+        if errors:
+            self._raise_errors(errors)
+
+        self._flat = self._flatten(self._config)
+
+    @staticmethod
+    def _raise_errors(errors: List[Dict[str, Union[str, int, List[str]]]]) -> None:
+        paths = [".".join(map(str, error["path"])) for error in errors]
+        for path, error in zip(paths, errors):
+            if error['code'] == REQUIRED_FIELD.code:
+                log.error("Configuration is missing the option '%s'. " \
+                    "Make sure to supply the option either via configuration, "\
+                    "environment variable or command line argument", path)
+            else:
+                log.error("Configuration contains an invalid option '%s': %s", path, error['msg'])
+        raise ConfigError("There is one or more errors in the configuration. Check the following options: {}".format(
+            ", ".join(paths)))
+
+    @classmethod
+    def _get_validator(cls, schema: Mapping) -> ConfigValidator:
+        """Return a validator for the given schema.
+
+        Compiling a schema is rather expensive, therefore validators of static
+        schemas are created once and then reused.
+        """
+        cached = cls._validators.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        validator = ConfigValidator(schema)
+        cls._validators[id(schema)] = (schema, validator)
+        return validator
 
     def _init_schema(self) -> None:
         raise NotImplementedError()
 
+    def top_level_options(self) -> Dict[str, Any]:
+        """Return the top-level options, that are set to a value."""
+        return {key: value for key, value in self._config.items() if value is not None}
+
+    @classmethod
+    def _flatten(cls, config: Mapping, prefix: str = "") -> Dict[str, Any]:
+        """Map the dotted path of every option to its value, including the
+        paths of nested mappings."""
+        flat = {}
+        for key, value in config.items():
+            if not isinstance(key, str):
+                continue
+            path = sys.intern(prefix + key)
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(cls._flatten(value, path + "."))
+        return flat
+
     @staticmethod
     def str_to_bool(val: str) -> bool:
-        return bool(strtobool(val.strip()))
+        return str_to_bool(val.strip())
 
     @staticmethod
     def str_to_list(val: str) -> List[int]:
         return list(map(lambda vi: vi.strip(), val.split(":")))
 
     @staticmethod
-    def val_to_row_column(val: Union[int, float, List[int]]) -> List[int]:
-        row = column = 0
-        if isinstance(val, str):
-            values = val.split(",")
-            if len(values) > 0:
-                row = int(values[0]) if len(values[0]) > 0 else 0
-            if len(values) > 1:
-                column = int(values[0]) if len(values[0]) > 0 else 0
-        if isinstance(val, (int, float)):
-            row = int[val]
-        if isinstance(val, list):
-            row = int(val[0]) if len(val) > 0 else 0
-            column = int(val[1]) if len(val) > 1 else 0
-        return [row, column]
+    def val_to_row_column(val: Union[str, int, float, List[int]]) -> List[int]:
+        parse = _ROW_COLUMN_PARSERS.get(type(val))
+        return parse(val) if parse is not None else [0, 0]
+
+
+class _Option(NamedTuple):
+    """Rules of an option of a plain config source.
+
+    Values of type 'coerce_from' are converted using 'coerce', afterwards the
+    value must be an instance of 'types'.
+    """
+    coerce_from: Optional[type] = None
+    coerce: Optional[Callable[[Any], Any]] = None
+    types: Optional[type] = None
+
+
+# rules shared by several options of the Config schema
+_REQUIRED_STRING = MappingProxyType({
+    "required": True,
+    "type": "string",
+    "empty": False,
+})
+_OPTIONAL_BOOLEAN = MappingProxyType({
+    "required": False,
+    "type": "boolean",
+    "default": False,
+})
+_NULLABLE_STRING = MappingProxyType({
+    "required": False,
+    "type": "string",
+    "nullable": True,
+    "default": None,
+})
+
+# schema of the merged Config
+_CONFIG_SCHEMA = MappingProxyType({
+    "input":
+        MappingProxyType({
+            "required": True,
+            "type": "list",
+            "empty": False,
+        }),
+    "template":
+        _REQUIRED_STRING,
+    "output":
+        _REQUIRED_STRING,
+    "force":
+        _OPTIONAL_BOOLEAN,
+    "delete":
+        _OPTIONAL_BOOLEAN,
+    "pre_hook":
+        _NULLABLE_STRING,
+    "post_hook":
+        _NULLABLE_STRING,
+    "csv_delimiter":
+        MappingProxyType({
+            "required": False,
+            "type": "string",
+            "minlength": 1,
+            "default": ",",
+        }),
+    "skip":
+        MappingProxyType({
+            **_NULLABLE_STRING,
+            "check_with": "jinja_template",
+        }),
+    "header_row_column":
+        MappingProxyType({
+            "required": False,
+            "type": "list",
+            "nullable": True,
+            "default": [0, 0],
+        }),
+    "vars":
+        MappingProxyType({
+            "required": False,
+            "type": "dict",
+            "allow_unknown": True,
+            "nullable": True,
+            "default": None,
+        }),
+    "jobs":
+        MappingProxyType({
+            "required": False,
+            "type": "integer",
+            "min": 1,
+            "default": 1,
+        }),
+})
 
 
 class Config(ConfigSource):
 
+    __slots__ = ("_api_src", "_env_src", "_file_src")
+
     def __init__(self, api_config_src: "ApiConfigSource", use_envs: Optional[bool] = False):
         self._api_src = api_config_src
-        self._env_src = EnvironmentConfigSource() if use_envs else ConfigSource()
-        config_file_path = api_config_src.get("config_path")
-        self._file_src = YmlFileConfigSource(config_file_path) if config_file_path else ConfigSource()
+        # unused sources aren't created at all
+        self._env_src = EnvironmentConfigSource() if use_envs else None
+        config_file_path = api_config_src.get("config_path", None)
+        self._file_src = YmlFileConfigSource(config_file_path) if config_file_path else None
         super().__init__()
+        self._config = self._merge_sources()
         self._validate()
 
     def _init_schema(self) -> None:
-        self._schema = {
-            "input": {
-                "required":
-                    True,
-                "type":
-                    "list",
-                "empty":
-                    False,
-                "default":
-                    self._defaults(
-                        self._api_src.get("input", None),
-                        self._env_src.get("JINTARO_INPUT", None),
-                        self._file_src.get("input", None),
-                        missing,
-                    ),
-            },
-            "template": {
-                "required":
-                    True,
-                "type":
-                    "string",
-                "empty":
-                    False,
-                "default":
-                    self._defaults(
-                        self._api_src.get("template", None),
-                        self._env_src.get("JINTARO_TEMPLATE", None),
-                        self._file_src.get("template", None),
-                        missing,
-                    ),
-            },
-            "output": {
-                "required":
-                    True,
-                "type":
-                    "string",
-                "empty":
-                    False,
-                "default":
-                    self._defaults(
-                        self._api_src.get("output", None),
-                        self._env_src.get("JINTARO_OUTPUT", None),
-                        self._file_src.get("output", None),
-                        missing,
-                    ),
-            },
-            "force": {
-                "required":
-                    False,
-                "type":
-                    "boolean",
-                "default":
-                    self._defaults(
-                        self._api_src.get("force", None),
-                        self._env_src.get("JINTARO_FORCE", None),
-                        self._file_src.get("force", None),
-                        False,
-                    ),
-            },
-            "delete": {
-                "required":
-                    False,
-                "type":
-                    "boolean",
-                "default":
-                    self._defaults(
-                        self._api_src.get("delete", None),
-                        self._env_src.get("JINTARO_DELETE", None),
-                        self._file_src.get("delete", None),
-                        False,
-                    ),
-            },
-            "pre_hook": {
-                "required":
-                    False,
-                "type":
-                    "string",
-                "nullable":
-                    True,
-                "default":
-                    self._defaults(
-                        self._api_src.get("pre_hook", None),
-                        self._env_src.get("JINTARO_PRE_HOOK", None),
-                        self._file_src.get("pre_hook", None),
-                    ),
-            },
-            "post_hook": {
-                "required":
-                    False,
-                "type":
-                    "string",
-                "nullable":
-                    True,
-                "default":
-                    self._defaults(
-                        self._api_src.get("post_hook", None),
-                        self._env_src.get("JINTARO_POST_HOOK", None),
-                        self._file_src.get("post_hook", None),
-                    ),
-            },
-            "csv_delimiter": {
-                "required":
-                    False,
-                "type":
-                    "string",
-                "minlength":
-                    1,
-                "default":
-                    self._defaults(
-                        self._api_src.get("csv_delimiter", None),
-                        self._env_src.get("JINTARO_CSV_DELIMITER", None),
-                        self._file_src.get("csv_delimiter", None),
-                        ",",
-                    ),
-            },
-            "skip": {
-                "required":
-                    False,
-                "type":
-                    "string",
-                "regex":
-                    r".*({{|{%|{#).*",
-                "nullable":
-                    True,
-                "default":
-                    self._defaults(
-                        self._api_src.get("skip", None),
-                        self._env_src.get("JINTARO_SKIP", None),
-                        self._file_src.get("skip", None),
-                    ),
-            },
-            "header_row_column": {
-                "required":
-                    False,
-                "type":
-                    "list",
-                "nullable":
-                    True,
-                "default":
-                    self._defaults(
-                        self._api_src.get("header_row_column", None),
-                        self._env_src.get("JINTARO_HEADER_ROW_COLUMN", None),
-                        self._file_src.get("header_row_column", None),
-                        [0, 0],
-                    ),
-            },
-            "vars": {
-                "required": False,
-                "type": "dict",
-                "allow_unknown": True,
-                "nullable": True,
-                "default": self._defaults(
-                    self._api_src.get("vars", None),
-                    self._file_src.get("vars", None),
-                ),
-            },
-        }
+        self._schema = _CONFIG_SCHEMA
 
-    @staticmethod
-    def _defaults(*values: Any) -> Any:
-        for value in values:
-            if value is not None:
-                return value
-        return None
+    def set(self, path: str, value: Any) -> None:
+        raise ConfigError("The merged configuration is read-only, options must be set on the individual sources")
+
+    def _merge_sources(self) -> Dict[str, Any]:
+        """Merge the options of all sources.
+
+        The sources are layered in order of precedence (API, environment,
+        file), so each option is looked up once in the combined mapping.
+        Options not provided by any source are left to the schema defaults.
+        """
+        layered = ChainMap(
+            *(src.top_level_options() for src in (self._api_src, self._env_src, self._file_src) if src is not None))
+        merged = {}
+        for option in self._schema:
+            value = layered.get(option, missing)
+            if value is not missing:
+                merged[option] = value
+        return merged
 
 
 class ApiConfigSource(ConfigSource):
 
+    __slots__ = ()
+
     def __init__(self, config: Optional[dict] = None):
         super().__init__()
         assert isinstance(config, (dict, type(None)))
@@ -345,82 +447,74 @@ class ApiConfigSource(ConfigSource):
         pass
 
 
+# rules of the options that can be set via environment variables
+_ENV_OPTIONS = {
+    "JINTARO_INPUT": _Option(str, ConfigSource.str_to_list, list),
+    "JINTARO_TEMPLATE": _Option(),
+    "JINTARO_OUTPUT": _Option(),
+    "JINTARO_FORCE": _Option(str, ConfigSource.str_to_bool, bool),
+    "JINTARO_DELETE": _Option(str, ConfigSource.str_to_bool, bool),
+    "JINTARO_PRE_HOOK": _Option(),
+    "JINTARO_POST_HOOK": _Option(),
+    "JINTARO_CSV_DELIMITER": _Option(),
+    "JINTARO_SKIP": _Option(),
+    "JINTARO_HEADER_ROW_COLUMN": _Option(object, ConfigSource.val_to_row_column, list),
+    "JINTARO_JOBS": _Option(str, int, int),
+}
+# option names by their environment variable
+_ENV_OPTION_NAMES = {env_var: env_var[len("JINTARO_"):].lower() for env_var in _ENV_OPTIONS}
+
+
 class EnvironmentConfigSource(ConfigSource):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self._get_environment_variables()
-        self._validate()
+        self._coerce(_ENV_OPTIONS)
 
     def _init_schema(self) -> None:
-        self._schema = {
-            "JINTARO_INPUT": {
-                "type": "list",
-                "coerce": (str, self.str_to_list),
-            },
-            "JINTARO_TEMPLATE": {},
-            "JINTARO_OUTPUT": {},
-            "JINTARO_FORCE": {
-                "type": "boolean",
-                "coerce": (str, self.str_to_bool),
-            },
-            "JINTARO_DELETE": {
-                "type": "boolean",
-                "coerce": (str, self.str_to_bool),
-            },
-            "JINTARO_PRE_HOOK": {},
-            "JINTARO_POST_HOOK": {},
-            "JINTARO_CSV_DELIMITER": {},
-            "JINTARO_SKIP": {},
-            "JINTARO_HEADER_ROW_COLUMN": {
-                "type": "list",
-                "coerce": self.val_to_row_column,
-            }
-        }
+        pass
 
     def _get_environment_variables(self) -> None:
-        self._config = {k: v for k, v in os.environ.items() if k.startswith("JINTARO_")}
+        self._config = dict(_jintaro_environment())
+
+    def top_level_options(self) -> Dict[str, Any]:
+        return {_ENV_OPTION_NAMES[key]: value for key, value in self._config.items() if value is not None}
+
+
+# rules of the options that can be set in a config file
+_FILE_OPTIONS = {
+    "input": _Option(str, ConfigSource.str_to_list, list),
+    "template": _Option(),
+    "output": _Option(),
+    "force": _Option(types=bool),
+    "delete": _Option(types=bool),
+    "pre_hook": _Option(),
+    "post_hook": _Option(),
+    "csv_delimiter": _Option(),
+    "skip": _Option(),
+    "header_row_column": _Option(object, ConfigSource.val_to_row_column, list),
+    "vars": _Option(types=dict),
+    "jobs": _Option(types=int),
+}
 
 
 class YmlFileConfigSource(ConfigSource):
 
+    __slots__ = ("_path",)
+
     def __init__(self, path: Union[str, Path]):
         assert isinstance(path, (str, Path))
         super().__init__()
         self._path = path if isinstance(path, Path) else Path(path)
         self._parse_file()
-        self._validate()
+        self._coerce(_FILE_OPTIONS)
         self._make_relative_paths()
 
     def _init_schema(self) -> None:
-        self._schema = {
-            "input": {
-                "type": "list",
-                "coerce": (str, self.str_to_list),
-            },
-            "template": {},
-            "output": {},
-            "force": {
-                "type": "boolean",
-            },
-            "delete": {
-                "type": "boolean",
-            },
-            "pre_hook": {},
-            "post_hook": {},
-            "csv_delimiter": {},
-            "skip": {},
-            "header_row_column": {
-                "type": "list",
-                "coerce": self.val_to_row_column,
-            },
-            "vars": {
-                "required": False,
-                "type": "dict",
-                "allow_unknown": True,
-                "nullable": True,
-            },
-        }
+        pass
 
     def _make_relative_paths(self) -> None:
 
@@ -442,9 +536,23 @@ class YmlFileConfigSource(ConfigSource):
         if template:
             self._config["template"] = make_relative(template)
 
+        # the index was built from the paths as they are written in the file
+        self._flat = self._flatten(self._config)
+
     def _parse_file(self) -> None:
         try:
-            config_raw_content = read_file(self._path)
-            self._config = yaml.load(config_raw_content, Loader=yaml.Loader) or {}
+            stat = self._path.stat()
+            key = (str(self._path.resolve()), stat.st_mtime_ns, stat.st_size)
+            parsed = _yaml_cache.get(key)
+            if parsed is None:
+                # let the loader read the raw file itself, instead of handing it a copy
+                # of the whole content
+                with self._path.open("rb") as config_file:
+                    parsed = yaml.load(config_file, Loader=YamlLoader) or {}
+                _yaml_cache[key] = parsed
+            # hand out a copy, the cached content must not be altered
+            self._config = deepcopy(parsed)
         except Exception as ex:
             raise ConfigError(f"Failed to read YAML config file: {ex}") from ex
+        if not isinstance(self._config, dict):
+            raise ConfigError(f"Config file '{self._path}' must contain a mapping")
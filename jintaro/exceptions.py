@@ -7,7 +7,18 @@ class ConfigError(JintaroException):
 
 
 class UnknownOptionError(ConfigError):
-    """"""
+    """Raised when looking up an option that isn't set.
+
+    Lookups with a fallback catch this error, therefore the message is only
+    formatted when needed.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.path = path
+
+    def __str__(self) -> str:
+        return f"No such option '{self.path}' in the configuration"
 
 
 class ConfigValueError(ConfigError):
@@ -1,9 +1,21 @@
 """ Custom Jinja2 filters """
 import re
-from distutils.util import strtobool
+from functools import lru_cache
 from pathlib import Path
 from shlex import quote as shlex_quote
 
+from jintaro.utils import str_to_bool
+
+
+@lru_cache(maxsize=4096)
+def _compile(pattern, flags):
+    """Compile a regex pattern, the filters are usually called with the same patterns for every row"""
+    return re.compile(pattern, flags)
+
+
+# group reference argument of 'regex_search', either '\\1' or '\\g<name>'
+_GROUP_ARG_RE = re.compile(r'\\(?:(\d+)|g<(\S+)>)')
+
 
 def regex_escape(string):
     """Escape special characters in a string so it can be used in regular expressions"""
@@ -17,7 +29,7 @@ def regex_findall(value, pattern, ignorecase=False, multiline=False):
         flags |= re.I
     if multiline:
         flags |= re.M
-    compiled_pattern = re.compile(pattern, flags=flags)
+    compiled_pattern = _compile(pattern, flags)
     return compiled_pattern.findall(str(value))
 
 
@@ -28,7 +40,7 @@ def regex_replace(value, pattern, replacement, ignorecase=False, multiline=False
         flags |= re.I
     if multiline:
         flags |= re.M
-    compiled_pattern = re.compile(pattern, flags=flags)
+    compiled_pattern = _compile(pattern, flags)
     return compiled_pattern.sub(replacement, str(value))
 
 
@@ -36,25 +48,19 @@ def regex_search(value, pattern, *args, **kwargs):
     """Do a regex search on 'value'"""
     groups = []
     for arg in args:
-        match = re.match(r'\\(\d+)', arg)
-        if match:
-            groups.append(int(match.group(1)))
-            continue
-
-        match = re.match(r'^\\g<(\S+)>', arg)
-        if match:
-            groups.append(match.group(1))
-            continue
-
-        raise Exception("Unknown argument: '{arg}'")
+        match = _GROUP_ARG_RE.match(arg)
+        if not match:
+            raise Exception(f"Unknown argument: '{arg}'")
+        number, name = match.groups()
+        groups.append(int(number) if number is not None else name)
 
     flags = 0
     if kwargs.get('ignorecase'):
         flags |= re.I
     if kwargs.get('multiline'):
         flags |= re.M
-    compiled_pattern = re.compile(pattern, flags=flags)
-    match = re.search(compiled_pattern, str(value))
+    compiled_pattern = _compile(pattern, flags)
+    match = compiled_pattern.search(str(value))
 
     if match:
         if not groups:
@@ -87,7 +93,7 @@ def to_bool(string, default_value=None):
 
     """
     try:
-        return bool(strtobool(string.strip()))
+        return str_to_bool(string.strip())
     except ValueError:
         if default_value is not None:
             return default_value
@@ -1,24 +1,66 @@
+import re
+import sys
 from ast import literal_eval
-from collections.abc import MutableMapping
-from distutils.util import strtobool
+from collections.abc import ItemsView, ValuesView
 
 from jinja2.defaults import (BLOCK_START_STRING, COMMENT_START_STRING, VARIABLE_START_STRING)
 from jinja2.runtime import StrictUndefined
 
-from jintaro.jinja.environment import JINJA_ENVIRONMENT
 from jintaro.jinja.filters import JINJA_FILTERS
-from jintaro.jinja.recursive_template import RecursiveTemplate
-from jintaro.utils import merge_dicts
+from jintaro.jinja.recursive_template import compile_template
+from jintaro.utils import merge_dicts, str_to_bool
 
+# matches any of the Jinja2 start delimiters
+_TEMPLATE_MARKER_RE = re.compile("|".join(
+    map(re.escape, (BLOCK_START_STRING, VARIABLE_START_STRING, COMMENT_START_STRING))))
 
-class RecursiveMapping(MutableMapping):
+# first characters of the Python literals understood by 'literal_eval', apart from 'None'
+_LITERAL_START_CHARS = frozenset("0123456789+-.([{'\"")
 
-    class UnresolvedString(str):
-        pass
+
+class RecursiveMapping(dict):
+    """Mapping of variables, whose string values may be Jinja2 templates
+    referencing other variables of the mapping. The templates are rendered on
+    first access.
+
+    Membership tests, iteration and length are served by the underlying dict,
+    only the item access resolves the templates.
+    """
+
+    class UnresolvedString:
+        """A template string, that still needs to be rendered. The compiled
+        template is kept, so a failed resolution can be retried without
+        compiling it again."""
+
+        __slots__ = ("source", "template")
+
+        def __init__(self, source: str):
+            self.source = source
+            self.template = None
+
+        def __str__(self):
+            return self.source
+
+        def __repr__(self):
+            return repr(self.source)
+
+        def __reduce__(self):
+            # compiled templates can't be pickled
+            return (self.__class__, (self.source,))
+
+        def compile(self):
+            if self.template is None:
+                self.template = compile_template(self.source)
+            return self.template
+
+    # names are mangled just like the attributes
+    __slots__ = ("__context", "__unresolved")
 
     def __init__(self, vars: dict, context=None):
-        self.__data = {}
+        super().__init__()
         self.__context = context
+        # keys of the values, that still need to be rendered
+        self.__unresolved = set()
         self.update(vars)
 
     @property
@@ -29,43 +71,86 @@ class RecursiveMapping(MutableMapping):
     def context(self, val):
         self.__context = val
 
+    def __reduce__(self):
+        # the context can't be pickled, it is recreated on first render instead
+        return (RecursiveMapping, (dict(self),))
+
+    def __missing__(self, key):
+        return StrictUndefined(name=key)
+
     def __getitem__(self, key):
-        if not key in self.__data:
-            return StrictUndefined(name=key)
-
-        value = self.__data[key]
-        if isinstance(value, self.UnresolvedString):
-            rendered_string = JINJA_ENVIRONMENT.from_string(value,
-                                                            template_class=RecursiveTemplate).render_recursive(self)
-            if rendered_string != value:
-                value = self._evaluate_string(rendered_string)
-            else:
-                value = str(value)
-            self.__data[key] = value
+        if key not in self.__unresolved:
+            return super().__getitem__(key)
+
+        value = super().__getitem__(key)
+        rendered_string = value.compile().render_recursive(self)
+        if rendered_string != value.source:
+            value = self._evaluate_string(rendered_string)
+        elif len(rendered_string) < 64:
+            # the same short strings tend to repeat in every row
+            value = sys.intern(rendered_string)
+        else:
+            value = rendered_string
+        super().__setitem__(key, value)
+        self.__unresolved.discard(key)
         return value
 
+    @classmethod
+    def _unwrap(cls, value):
+        """Return the template string of an unresolved value, any other value as is."""
+        return value.source if isinstance(value, cls.UnresolvedString) else value
+
     def __setitem__(self, key, value):
-        if isinstance(value, str):
-            if self._is_possibly_template(value):
-                self.__data[key] = self.UnresolvedString(value)
-            else:
-                self.__data[key] = value
-        elif isinstance(value, dict):
-            self.__data[key] = RecursiveMapping(value, context=self.__context)
+        if isinstance(value, str) and self._is_possibly_template(value):
+            value = self.UnresolvedString(value)
+            self.__unresolved.add(key)
+        elif isinstance(value, self.UnresolvedString):
+            # raw value of another mapping, e.g. when copied by Jinja2
+            self.__unresolved.add(key)
         else:
-            self.__data[key] = value
+            if isinstance(value, dict):
+                value = RecursiveMapping(value, context=self.__context)
+            self.__unresolved.discard(key)
+        super().__setitem__(key, value)
 
     def __delitem__(self, key):
-        del self.__data[key]
+        super().__delitem__(key)
+        self.__unresolved.discard(key)
+
+    def pop(self, key, *default):
+        self.__unresolved.discard(key)
+        return self._unwrap(super().pop(key, *default))
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.__unresolved.discard(key)
+        return key, self._unwrap(value)
+
+    def copy(self):
+        # the unresolved values are shared, the copy resolves them on its own
+        return RecursiveMapping(self)
 
-    def __iter__(self):
-        return iter(self.__data)
+    def clear(self):
+        super().clear()
+        self.__unresolved.clear()
 
-    def __len__(self):
-        return len(self.__data)
+    def get(self, key, default=None):
+        return self[key] if key in self else default
 
-    def __str__(self):
-        return str(self.__data)
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
 
     @staticmethod
     def _evaluate_string(string):
@@ -77,16 +162,20 @@ class RecursiveMapping(MutableMapping):
         Returns:
             str, int, float, bool, list or dict: The value of the evaluated string
         """
-        try:
-            # evaluate to int, float, list, dict
-            return literal_eval(string.strip())
-        except (ValueError, SyntaxError):
+        stripped = string.strip()
+        # only hand strings to the parser, that may actually be literals
+        if stripped[:1] in _LITERAL_START_CHARS or stripped == "None":
             try:
-                # evaluate bool from different variations
-                return bool(strtobool(string.strip()))
-            except ValueError:
-                # string cannot be evaluated -> return string
-                return string
+                # evaluate to int, float, list, dict
+                return literal_eval(stripped)
+            except (ValueError, SyntaxError):
+                pass
+        try:
+            # evaluate bool from different variations
+            return str_to_bool(stripped)
+        except ValueError:
+            # string cannot be evaluated -> return string
+            return string
 
     @staticmethod
     def _is_possibly_template(data):
@@ -98,8 +187,5 @@ class RecursiveMapping(MutableMapping):
         Returns:
             bool: True if a string looks like a Jinja2 template, False otherwise.
         """
-        if isinstance(data, str):
-            for marker in (BLOCK_START_STRING, VARIABLE_START_STRING, COMMENT_START_STRING):
-                if marker in data:
-                    return True
-        return False
+        # all delimiters start with a brace, most strings can be ruled out by looking for it alone
+        return isinstance(data, str) and "{" in data and _TEMPLATE_MARKER_RE.search(data) is not None
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from jinja2.environment import Template
 from jinja2.runtime import Context
 from jinja2.utils import concat, missing
@@ -7,9 +9,16 @@ from jintaro.jinja.filters import JINJA_FILTERS
 from jintaro.utils import merge_dicts
 
 
+@lru_cache(maxsize=1024)
+def compile_template(source):
+    # the same sources are rendered over and over again for each row, therefore
+    # compile them only once
+    return JINJA_ENVIRONMENT.from_string(source, template_class=RecursiveTemplate)
+
+
 def render_template(template, context):
     if template:
-        return JINJA_ENVIRONMENT.from_string(template, template_class=RecursiveTemplate).render(context)
+        return compile_template(template).render(context)
     return template
 
 
@@ -22,13 +31,12 @@ class RecursiveTemplate(Template):
             self.lazy_vars = lazy_vars
 
         def resolve_or_missing(self, key):
-            if key in self.vars:
-                return self.vars[key]
-            if key in self.parent:
-                return self.parent[key]
-            elif key in self.lazy_vars:
-                return self.lazy_vars[key]
-            return missing
+            value = self.vars.get(key, missing)
+            if value is missing:
+                value = self.parent.get(key, missing)
+                if value is missing:
+                    value = self.lazy_vars.get(key, missing)
+            return value
 
     def render_recursive(self, vars: "RecursiveMapping"):
         if not vars.context:
@@ -1,17 +1,40 @@
+import locale
+import logging
+import os
 import re
+import selectors
+import stat
 import subprocess
-from distutils.util import strtobool
+import sys
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import suppress
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Mapping, Optional, Tuple, Union
-
-import pyexcel
+from shlex import quote as shlex_quote
+from typing import Any, Dict, Generator, Iterable, List, Mapping, Optional, Tuple, Union
 
 from . import exceptions
 from .config import ApiConfigSource, Config
 from .jinja.recursive_mapping import RecursiveMapping
-from .jinja.recursive_template import render_template
-from .log import log
-from .utils import check_file, merge_dicts, read_file
+from .jinja.recursive_template import compile_template
+from .log import configure_root_logger, configured_level, log
+from .utils import check_file, read_file, str_to_bool
+
+# patterns to turn a column header into a valid identifier
+_replace_invalid_header_chars = re.compile('[^0-9a-zA-Z_]').sub
+_remove_invalid_header_start = re.compile('^[^a-zA-Z_]+').sub
+_is_valid_header = re.compile('[a-zA-Z_][0-9a-zA-Z_]*').fullmatch
+
+
+def _process_header(header: str) -> str:
+    header = header.lower()
+    # most headers are valid identifiers already, one match is cheaper than two substitutions
+    if _is_valid_header(header):
+        return header
+    # create valid identifier by removing invalid combinations
+    return _remove_invalid_header_start('', _replace_invalid_header_chars('_', header))
 
 
 class Jintaro:
@@ -29,6 +52,7 @@ class Jintaro:
             "header_row_column": None,
             "csv_delimiter": None,
             "vars": None,
+            "jobs": None,
             "continue_on_error": None,
         })
 
@@ -67,9 +91,10 @@ class Jintaro:
         paths = self._api_config.get("input")
         if path is None:
             return paths
+        # build a new list instead of altering the stored one, which doesn't exist for the first input
+        paths = list(paths or ())
         if isinstance(path, list):
-            list_of_paths = [Path(p) for p in path]
-            paths.extend(list_of_paths)
+            paths.extend(Path(p) if isinstance(p, str) else p for p in path)
         elif isinstance(path, str):
             paths.append(Path(path))
         else:
@@ -150,6 +175,15 @@ class Jintaro:
 
         return self._property("vars", vars, clear)
 
+    def jobs(self, count: Optional[int] = None, clear: bool = False) -> Union["Jintaro", int, None]:
+        assert isinstance(count, (int, type(None)))
+        assert isinstance(clear, bool)
+
+        if count is not None and count < 1:
+            raise exceptions.ConfigValueError("Number of jobs must be at least 1")
+
+        return self._property("jobs", count, clear)
+
     def continue_on_error(self, value: Optional[bool] = None, clear: bool = False) -> Union["Jintaro", bool, None]:
         assert isinstance(value, (bool, type(None)))
         assert isinstance(clear, bool)
@@ -160,17 +194,27 @@ class Jintaro:
         # generate final config
         config = Config(self._api_config, use_envs=True)
 
+        workers = config.get("jobs")
+        if workers > 1:
+            self._run_parallel(self._generate_jobs(config), workers)
+            return
+
+        # the hooks of all jobs are run by a single shell, where supported
+        hook_shell = _HookShell() if os.name == "posix" else None
+
         # generate jobs
-        jobs = self._generate_jobs(config)
+        jobs = self._generate_jobs(config, hook_shell)
 
         # run jobs
-        for job in jobs:
-            try:
-                job.run()
-            except Exception as ex:  #pylint: disable=broad-except
-                if not self._api_config.get("continue_on_error"):
-                    raise ex
-                log.error(str(ex))
+        try:
+            for job in jobs:
+                try:
+                    job.run()
+                except Exception as ex:  #pylint: disable=broad-except
+                    self._handle_job_error(ex)
+        finally:
+            if hook_shell is not None:
+                hook_shell.close()
 
     # -------------------------------------------------------------------------#
     #      __     _    ____ ___                                                #
@@ -181,6 +225,40 @@ class Jintaro:
     #                                                                          #
     # -------------------------------------------------------------------------#
 
+    def _run_parallel(self, jobs: Iterable["JintaroJob"], workers: int) -> None:
+        """Run the jobs in a pool of worker processes.
+
+        Jobs are submitted as they are generated, but only a few per worker
+        are kept in flight, so that large input files aren't turned into jobs
+        all at once.
+        """
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for job in jobs:
+                    pending.append(executor.submit(job.run))
+                    if len(pending) >= workers * 4:
+                        self._wait_for_job(pending.popleft())
+                while pending:
+                    self._wait_for_job(pending.popleft())
+            except BaseException:
+                # stop like the sequential run does, only the jobs that are
+                # already running are finished before the pool shuts down
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def _wait_for_job(self, future: Future) -> None:
+        try:
+            future.result()
+        except Exception as ex:  #pylint: disable=broad-except
+            self._handle_job_error(ex)
+
+    def _handle_job_error(self, ex: Exception) -> None:
+        if not self._api_config.get("continue_on_error"):
+            raise ex
+        log.error(str(ex))
+
     def _property(self, name: str, value: Any, clear: bool):
         if clear:
             self._api_config.set(name, None)
@@ -190,48 +268,46 @@ class Jintaro:
         self._api_config.set(name, value)
         return self
 
-    def _generate_jobs(self, config: Config) -> Generator[dict, None, None]:
+    def _generate_jobs(self, config: Config, hook_shell: Optional["_HookShell"] = None) -> Generator[dict, None, None]:
+        # pyexcel loads its whole plugin registry, only pay for it when there is something to read
+        import pyexcel  #pylint: disable=import-outside-toplevel
+
         input_paths = config.get("input")
         extra_variables = config.get("vars") or {}
+        # compiled templates by their path string, shared by all jobs of the run
+        templates = {}
 
         # check input file existence
         for path in input_paths:
             path = Path(path)
             check_file(path, binary=path.suffix in [".ods", ".xlsx"])
 
+        header_row, header_column = config.get("header_row_column")
+
         # go through each input file and parse the data
         for path in input_paths:
-            # load sheet
-            sheet = pyexcel.get_sheet(
+            # stream the rows instead of loading the whole sheet into memory
+            rows = pyexcel.iget_array(
                 file_name=str(path),
                 delimiter=config.get("csv_delimiter"),
-                start_column=config.get("header_row_column")[0],
-                start_row=config.get("header_row_column")[1],
-                name_columns_by_row=0,
+                start_row=header_row,
+                start_column=header_column,
                 skip_empty_rows=True,
             )
+            try:
+                colnames = next(rows, None)
+                if not colnames:
+                    raise exceptions.InputListError(f"Input file '{path}' is missing a proper column header.")
 
-            if not sheet.colnames:
-                raise exceptions.InputListError(f"Input file '{path}' is missing a proper column header.")
-
-            # parse headers
-            def process_header(header):
-                header = header.lower()
-                # create valid identifier by removing invalid combinations
-                header = re.sub('[^0-9a-zA-Z_]', '_', header)
-                header = re.sub('^[^a-zA-Z_]+', '', header)
-                return header
-
-            headers = list(map(process_header, sheet.colnames))
+                # parse headers, interned since they are looked up for every row
+                headers = tuple(sys.intern(_process_header(str(header))) for header in colnames)
+                # streamed rows aren't padded to the width of the header
+                padding = ("",) * len(headers)
 
-            # turn rows into jobs
-            for i, row_data in enumerate(sheet.rows()):
-                variables = {headers[i]: val for i, val in enumerate(row_data)}
-                variables = merge_dicts(extra_variables, variables)
-                yield JintaroJob(
+                # the variables, that are the same for all rows of the file
+                file_variables = JintaroJob.file_variables(
                     cwd=self._api_config.get("config_path").parent,
                     input_path=path,
-                    row=i,
                     output_path=config.get("output"),
                     template_path=config.get("template"),
                     pre_hook=config.get("pre_hook"),
@@ -239,38 +315,75 @@ class Jintaro:
                     skip=config.get("skip"),
                     force=config.get("force"),
                     delete=config.get("delete"),
-                    variables=variables,
                 )
 
+                # turn rows into jobs
+                for i, row_data in enumerate(rows):
+                    # cell values are scalars, so they can simply be laid over the other variables
+                    variables = {**file_variables, "row": i, "__row": i, **extra_variables}
+                    variables.update(zip(headers, chain(row_data, padding)))
+                    yield JintaroJob(variables, templates=templates, hook_shell=hook_shell)
+            finally:
+                pyexcel.free_resources()
+
+
+# compiled templates of the jobs, that were handed to this process by a pool
+_PROCESS_TEMPLATES: Dict[str, Any] = {}
+
+# encoding of the rendered files, the same 'Path.write_text' uses by default
+_OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
 
 class JintaroJob:
 
-    def __init__(self, cwd, input_path, row, output_path, template_path, pre_hook, post_hook, skip, force, delete,
-                 variables):
-        job_vars = {
+    __slots__ = ("_templates", "_hook_shell", "_context")
+
+    def __init__(self, variables: Mapping[str, Any], templates=None, hook_shell=None):
+        self._templates = {} if templates is None else templates
+        self._hook_shell = hook_shell
+        self._context = RecursiveMapping(variables)
+
+    @staticmethod
+    def file_variables(cwd, input_path, output_path, template_path, pre_hook, post_hook, skip, force,
+                       delete) -> Dict[str, Any]:
+        """Return the job variables, that don't depend on the row."""
+        input_path = str(input_path)
+        output_path = str(output_path)
+        template_path = str(template_path)
+        return {
             "__cwd": str(cwd),
-            "input": str(input_path),
-            "__input": str(input_path),
-            "src": str(input_path),
-            "__src": str(input_path),
-            "row": row,
-            "__row": row,
-            "destination": str(output_path),
-            "__destination": str(output_path),
-            "dest": str(output_path),
-            "__dest": str(output_path),
-            "output": str(output_path),
-            "__output": str(output_path),
-            "template": str(template_path),
-            "__template": str(template_path),
+            "input": input_path,
+            "__input": input_path,
+            "src": input_path,
+            "__src": input_path,
+            "destination": output_path,
+            "__destination": output_path,
+            "dest": output_path,
+            "__dest": output_path,
+            "output": output_path,
+            "__output": output_path,
+            "template": template_path,
+            "__template": template_path,
             "__pre_hook": pre_hook,
             "__post_hook": post_hook,
             "__skip": skip,
             "__force": force,
             "__delete": delete,
         }
-        job_vars.update(variables)
-        self._context = RecursiveMapping(job_vars)
+
+    def __getstate__(self) -> Tuple[RecursiveMapping, Optional[str]]:
+        # the template cache and the hook shell belong to the process, that
+        # created the job, workers of a pool run the job on their own
+        return self._context, configured_level()
+
+    def __setstate__(self, state: Tuple[RecursiveMapping, Optional[str]]) -> None:
+        context, log_level = state
+        # spawned workers start with an unconfigured logging module, set it up
+        # like the process, that created the job (only done for the first job)
+        configure_root_logger(log_level)
+        self._templates = _PROCESS_TEMPLATES
+        self._hook_shell = None
+        self._context = context
 
     @property
     def cwd(self) -> str:
@@ -315,21 +428,26 @@ class JintaroJob:
     def _run_hook(self, command: str, hook_type: str) -> None:
         if command:
             log.debug("Running %s hook %s", hook_type, command)
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                cwd=self.cwd,
-                universal_newlines=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            process.wait()
-            process_output = lambda output: "\n".join(output.splitlines())
-            stdout = process_output(process.stdout.read())
-            stderr = process_output(process.stderr.read())
-            log.debug(stdout)
-            if process.returncode != 0:
-                print(f"Error code: {process.returncode}")
+            if self._hook_shell is not None:
+                returncode, stdout, stderr = self._hook_shell.run(command, self.cwd)
+            else:
+                result = subprocess.run(
+                    command,
+                    shell=True,
+                    cwd=self.cwd,
+                    universal_newlines=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=False,
+                )
+                returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
+            # newlines are already normalized, only the trailing one needs to go, but
+            # don't copy the possibly long output just to throw it away
+            if stdout and log.isEnabledFor(logging.DEBUG):
+                log.debug(stdout.rstrip("\n"))
+            if returncode != 0:
+                print(f"Error code: {returncode}")
+                stderr = stderr.rstrip("\n")
                 raise exceptions.HookRunError(f"Failed to run {hook_type} hook for '{self.output}': {stderr}")
 
     def run(self) -> None:
@@ -338,34 +456,185 @@ class JintaroJob:
         if skip:
             try:
                 if isinstance(skip, str):
-                    skip = bool(strtobool(skip))
+                    skip = str_to_bool(skip)
             except Exception as ex:
                 raise exceptions.OutputError(f"Failed to evaluate skip rule: {ex}")
             if skip:
-                log.v("Skipping dataset %s from '%s'", self.row + 1, self.input)
+                log.v("Skipping dataset %s from '%s'", self.row + 1, self._context["__input"])
                 return
 
-        log.v("Processing dataset %s from '%s'", self.row + 1, str(self.input))
+        log.v("Processing dataset %s from '%s'", self.row + 1, self._context["__input"])
 
         # run pre hook
         self._run_hook(self.pre_hook, 'pre')
 
-        # render template
-        template_content = read_file(self.template)
-        rendered_template = render_template(template_content, self._context)
-
-        # write content to file
-        if self.output.exists():
-            if not self.output.is_file():
-                raise exceptions.OutputError(f"Path '{self.output}' exists and is not a file. ")
+        # compile template
+        # the cache is keyed by the plain string, which is all that is needed to read the file
+        template_path = self._context["__template"]
+        template = self._templates.get(template_path)
+        if template is None:
+            template = self._templates[template_path] = compile_template(read_file(template_path))
+
+        # check the output path
+        output = self.output
+        try:
+            output_stat = output.stat()
+        except FileNotFoundError:
+            output_stat = None
+        else:
+            if not stat.S_ISREG(output_stat.st_mode):
+                raise exceptions.OutputError(f"Path '{output}' exists and is not a file. ")
             if not self.force:
-                raise exceptions.OutputError(f"Path '{self.output}' already exists. Use 'force' to overwrite it.")
-        self.output.parent.mkdir(parents=True, exist_ok=True)
-        self.output.write_text(rendered_template)
+                raise exceptions.OutputError(f"Path '{output}' already exists. Use 'force' to overwrite it.")
+
+        # render into a temporary file next to the output, which replaces the output only once
+        # the rendering succeeded, an existing file stays untouched otherwise (a symlink is kept
+        # and the file it points to is replaced instead)
+        target = output if output_stat is None else Path(os.path.realpath(output))
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        try:
+            temp_fd = os.open(temp_path, flags, 0o666)
+        except FileNotFoundError:
+            # the directory is only created, when it doesn't exist yet
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd = os.open(temp_path, flags, 0o666)
+
+        # render the template straight into the file, without holding the whole content in memory
+        try:
+            # text mode translates the newlines to the ones of the platform, just like 'write_text' did
+            with open(temp_fd, "w", encoding=_OUTPUT_ENCODING) as output_file:
+                template.stream(self._context).dump(output_file)
+            if self.force:
+                if output_stat is not None:
+                    # keep the permissions of the replaced file
+                    os.chmod(temp_path, stat.S_IMODE(output_stat.st_mode))
+                os.replace(temp_path, target)
+            else:
+                # another job may have created the output in the meantime, unlike
+                # replacing it, linking the file fails then
+                try:
+                    os.link(temp_path, target)
+                except FileExistsError:
+                    raise exceptions.OutputError(  #pylint: disable=raise-missing-from
+                        f"Path '{output}' already exists. Use 'force' to overwrite it.")
+                except OSError:
+                    # the file system doesn't support hard links
+                    os.replace(temp_path, target)
+        finally:
+            # either moved or linked to the output already, or not needed anymore
+            with suppress(FileNotFoundError):
+                temp_path.unlink()
 
         # run pre hook
         self._run_hook(self.post_hook, 'post')
 
         # delete rendered file
         if self.delete:
-            self.output.unlink()
+            output.unlink()
+
+
+class _HookShell:
+    """A long-running shell, that runs the hook commands one after another.
+
+    Starting a new shell for every hook of every row is rather slow, therefore
+    the commands are fed to a single shell instead. Each command is evaluated
+    in a subshell, so it can't alter the state of the shell, and is followed
+    by a marker on both output streams, which carries the exit code and tells
+    where the output of the command ends.
+
+    The commands behave as if each was run by a shell of its own: they read
+    from the stdin of this process and see the current environment, the shell
+    is restarted whenever the environment or the working directory changes.
+    """
+
+    __slots__ = ("_process", "_commands", "_cwd", "_environ", "_marker")
+
+    def __init__(self):
+        self._process = None
+        self._commands = None
+        self._cwd = None
+        self._environ = None
+        self._marker = f"__jintaro_hook_done_{uuid.uuid4().hex}__".encode()
+
+    def run(self, command: str, cwd: str) -> Tuple[int, str, str]:
+        """Run a command and return its exit code, stdout and stderr."""
+        environ = dict(os.environ)
+        if (self._process is None or self._process.poll() is not None or self._cwd != cwd or self._environ != environ):
+            self._start(cwd, environ)
+
+        marker = self._marker.decode()
+        script = (f"(eval {shlex_quote(command)})\n"
+                  f"printf '\\n%s %d\\n' {marker} $?\n"
+                  f"printf '\\n%s\\n' {marker} >&2\n")
+        try:
+            self._commands.write(script.encode())
+            self._commands.flush()
+        except BrokenPipeError as ex:
+            self.close()
+            raise exceptions.HookRunError("The hook shell exited unexpectedly") from ex
+
+        stdout, stderr = self._read_output()
+        end = stdout.rindex(b"\n" + self._marker)
+        returncode = int(stdout[end + len(self._marker) + 1:])
+        stdout = stdout[:end]
+        stderr = stderr[:-len(self._marker) - 2]
+        # normalize the newlines just like 'universal_newlines' does
+        return (returncode, stdout.replace(b"\r\n", b"\n").decode(errors="replace"),
+                stderr.replace(b"\r\n", b"\n").decode(errors="replace"))
+
+    def _start(self, cwd: str, environ: Dict[str, str]) -> None:
+        self.close()
+        # the shell reads the commands as a script from a pipe of its own, so
+        # that its stdin, which the commands inherit, stays the one of this process
+        commands_read, commands_write = os.pipe()
+        try:
+            self._process = subprocess.Popen(
+                ["/bin/sh", f"/dev/fd/{commands_read}"],
+                cwd=cwd,
+                env=environ,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(commands_read,),
+            )
+        except BaseException:
+            os.close(commands_write)
+            raise
+        finally:
+            os.close(commands_read)
+        self._commands = os.fdopen(commands_write, "wb")
+        self._cwd = cwd
+        self._environ = environ
+
+    def _read_output(self) -> Tuple[bytes, bytes]:
+        """Read both output streams until the markers were written."""
+        buffers = {self._process.stdout.fileno(): bytearray(), self._process.stderr.fileno(): bytearray()}
+        stdout, stderr = buffers.values()
+        stdout_end = re.compile(b"\n" + re.escape(self._marker) + b" -?\\d+\n$")
+        stderr_end = b"\n" + self._marker + b"\n"
+        with selectors.DefaultSelector() as selector:
+            for fd in buffers:
+                selector.register(fd, selectors.EVENT_READ)
+            # the marker line of stdout is short, only its tail needs to be searched
+            while not (stdout_end.search(stdout, max(0,
+                                                     len(stdout) - len(stderr_end) - 16)) and
+                       stderr.endswith(stderr_end)):
+                for key, _ in selector.select():
+                    data = os.read(key.fd, 65536)
+                    if not data:
+                        self.close()
+                        raise exceptions.HookRunError("The hook shell exited unexpectedly")
+                    buffers[key.fd] += data
+        return bytes(stdout), bytes(stderr)
+
+    def close(self) -> None:
+        if self._process is not None:
+            try:
+                self._commands.close()
+            except BrokenPipeError:
+                pass
+            self._commands = None
+            self._process.wait()
+            self._process.stdout.close()
+            self._process.stderr.close()
+            self._process = None
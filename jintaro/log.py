@@ -26,18 +26,29 @@ add_log_level("vvv", logging.INFO + 2)
 
 log = logging.getLogger(__name__)
 
+# level the root logger has last been configured with
+_configured_level = None
+
+
+def configured_level():
+    """Return the level the root logger has been configured with, if any."""
+    return _configured_level
+
 
 def configure_root_logger(level):
+    global _configured_level  #pylint: disable=global-statement
+    if level is None or level == _configured_level:
+        return
 
     class StdoutFilter:  #pylint: disable=too-few-public-methods
 
-        def filter(self, record) -> bool:  #pylint: disable=no-self-use
-            return record.levelno < logging.WARNING
+        def filter(self, record, _warning=logging.WARNING) -> bool:  #pylint: disable=no-self-use
+            return record.levelno < _warning
 
     class StderrFilter:  #pylint: disable=too-few-public-methods
 
-        def filter(self, record) -> bool:  #pylint: disable=no-self-use
-            return record.levelno >= logging.WARNING
+        def filter(self, record, _warning=logging.WARNING) -> bool:  #pylint: disable=no-self-use
+            return record.levelno >= _warning
 
     logging_config = {
         "version": 1,
@@ -78,3 +89,4 @@ def configure_root_logger(level):
         }
     }
     logging.config.dictConfig(logging_config)
+    _configured_level = level
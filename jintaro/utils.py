@@ -1,5 +1,8 @@
+import io
+import os
+import stat
 from pathlib import Path
-from typing import Any, Dict, Mapping, Union
+from typing import Any, Dict, Mapping, Tuple, Union
 
 
 def merge_dicts(x: Mapping[Any, Any], y: Mapping[Any, Any]) -> Dict[Any, Any]:
@@ -21,21 +24,92 @@ def merge_dicts(x: Mapping[Any, Any], y: Mapping[Any, Any]) -> Dict[Any, Any]:
     if y is None:
         return x
 
-    merged = dict(x, **y)
-    xkeys = x.keys()
-
-    for key in xkeys:
-        if isinstance(x[key], dict) and key in y:
-            merged[key] = merge_dicts(x[key], y[key])
+    # the shallow merge is all there is to do, unless both sides have a dict under the same key
+    merged = {**x, **y}
+
+    # merge the nested dicts level by level, instead of recursing into them, only the
+    # keys of 'y' can overlap, so those are the ones to look at
+    stack = [(merged, x, y)]
+    while stack:
+        target, x, y = stack.pop()
+        for key, y_value in y.items():
+            x_value = x.get(key)
+            if isinstance(x_value, dict):
+                if y_value is None:
+                    # a None value doesn't replace the nested dict
+                    target[key] = x_value
+                else:
+                    nested = target[key] = {**x_value, **y_value}
+                    stack.append((nested, x_value, y_value))
     return merged
 
 
+# string representations of boolean values
+_BOOL_VALUES = {
+    "y": True,
+    "yes": True,
+    "t": True,
+    "true": True,
+    "on": True,
+    "1": True,
+    "n": False,
+    "no": False,
+    "f": False,
+    "false": False,
+    "off": False,
+    "0": False,
+}
+
+
+def str_to_bool(string: str) -> bool:
+    """Convert a string representation of truth to a bool.
+
+    True values are 'y', 'yes', 't', 'true', 'on', and '1'; false values are 'n',
+    'no', 'f', 'false', 'off', and '0'. The comparison is case insensitive.
+
+    Args:
+        string (str): String to convert
+
+    Returns:
+        bool: The converted value
+
+    Raises:
+        ValueError: If the string doesn't represent a boolean value.
+    """
+    try:
+        return _BOOL_VALUES[string.lower()]
+    except KeyError:
+        raise ValueError(f"Invalid truth value '{string}'")  #pylint: disable=raise-missing-from
+
+
+# contents of the files read so far by (path, mtime, size)
+_read_file_cache: Dict[Tuple[str, int, int], str] = {}
+
+
 def read_file(path: Union[Path, str]) -> str:
-    if isinstance(path, str):
-        path = Path(path)
-    check_file(path)
-    with path.open("r") as f:
-        file_content = f.read()
+    # plain strings are all the os functions need, no Path objects to build
+    path = os.fspath(path)
+    try:
+        path_stat = os.stat(path)
+    except OSError:
+        # let the check report the problem
+        check_file(path)
+        raise
+    if not stat.S_ISREG(path_stat.st_mode):
+        raise OSError(f"Given path '{path}' is not a file")
+    key = (os.path.abspath(path), path_stat.st_mtime_ns, path_stat.st_size)
+    file_content = _read_file_cache.get(key)
+    if file_content is None:
+        # read the file once and check the very same bytes for being binary, instead
+        # of opening it a second time
+        with open(path, "rb") as f:
+            data = f.read()
+        if b"\0" in data[:8000]:
+            raise OSError(f"Given file '{path}' is supposed to be a text file, but it seems to be binary")
+        # decode just like a file opened in text mode would
+        with io.TextIOWrapper(io.BytesIO(data)) as f:
+            file_content = f.read()
+        _read_file_cache[key] = file_content
     return file_content
 
 
@@ -49,18 +123,25 @@ def check_file(path: Union[Path, str], binary: bool = False) -> None:
         FileNotFoundError: If file does not exist.
         OSError: If path is either not a file or is a binary file.
     """
-    if isinstance(path, str):
-        path = Path(path)
-    if not path.exists():
-        raise FileNotFoundError(f"Given file '{path}' doesn't exist")
-    if not path.is_file():
+    path = os.fspath(path)
+    # a single stat answers both questions and is reused by the binary check
+    try:
+        path_stat = os.stat(path)
+    except OSError:
+        raise FileNotFoundError(f"Given file '{path}' doesn't exist")  #pylint: disable=raise-missing-from
+    if not stat.S_ISREG(path_stat.st_mode):
         raise OSError(f"Given path '{path}' is not a file")
-    if binary and not is_binary(path):
+    file_is_binary = _is_binary(path, path_stat)
+    if binary and not file_is_binary:
         raise OSError(f"Given file '{path}' is supposed to be a binary file, but it seems to be a text file")
-    if not binary and is_binary(path):
+    if not binary and file_is_binary:
         raise OSError(f"Given file '{path}' is supposed to be a text file, but it seems to be binary")
 
 
+# results of the binary checks so far by (path, mtime, size)
+_is_binary_cache: Dict[Tuple[str, int, int], bool] = {}
+
+
 def is_binary(path: Union[Path, str]) -> bool:
     """Return true if the given filename is binary.
 
@@ -70,11 +151,18 @@ def is_binary(path: Union[Path, str]) -> bool:
     Returns:
         bool: True if file appears to be binary, False otherwise
     """
-    if isinstance(path, str):
-        path = Path(path)
-    with path.open("rb") as f:
-        chunk = f.read(8000)
-        if b"\0" in chunk:
-            return True
-
-    return False
+    path = os.fspath(path)
+    return _is_binary(path, os.stat(path))
+
+
+def _is_binary(path: str, path_stat: os.stat_result) -> bool:
+    key = (os.path.abspath(path), path_stat.st_mtime_ns, path_stat.st_size)
+    binary = _is_binary_cache.get(key)
+    if binary is None:
+        # a raw file descriptor is enough for a single read, no buffered file object needed
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            binary = _is_binary_cache[key] = b"\0" in os.read(fd, 8000)
+        finally:
+            os.close(fd)
+    return binary
@@ -0,0 +1,42 @@
+import pytest
+
+from jintaro.config import YmlFileConfigSource
+from jintaro.exceptions import ConfigError
+from jintaro.jintaro import Jintaro
+
+
+def _write_project(directory):
+    directory.mkdir()
+    (directory / "in.csv").write_text("name\nalice\n")
+    (directory / "t.j2").write_text("Hello {{ name }}")
+    config_path = directory / "jintaro.yml"
+    config_path.write_text("input: in.csv\ntemplate: t.j2\noutput: \"out/{{ name }}\"\n")
+    return config_path
+
+
+def test_relative_paths_of_config_file(tmp_path, monkeypatch):
+    config_path = _write_project(tmp_path / "project")
+    monkeypatch.chdir(tmp_path)
+
+    source = YmlFileConfigSource(config_path.relative_to(tmp_path))
+
+    assert source.get("input") == [str(config_path.parent.relative_to(tmp_path) / "in.csv")]
+    assert source.get("template") == str(config_path.parent.relative_to(tmp_path) / "t.j2")
+
+
+def test_run_config_file_from_other_directory(tmp_path, monkeypatch):
+    config_path = _write_project(tmp_path / "project")
+    monkeypatch.chdir(tmp_path)
+
+    Jintaro().config(config_path.relative_to(tmp_path)).run()
+
+    assert (config_path.parent / "out" / "alice").read_text() == "Hello alice"
+
+
+@pytest.mark.parametrize("content", ["- input: in.csv\n", "in.csv\n"])
+def test_config_file_must_contain_mapping(tmp_path, content):
+    config_path = tmp_path / "jintaro.yml"
+    config_path.write_text(content)
+
+    with pytest.raises(ConfigError, match="must contain a mapping"):
+        YmlFileConfigSource(config_path)
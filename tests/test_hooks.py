@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from jintaro.jintaro import _HookShell
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="the hook shell is only used on POSIX systems")
+
+
+def test_hook_shell_sees_environment_changes(tmp_path, monkeypatch):
+    shell = _HookShell()
+    try:
+        monkeypatch.setenv("JINTARO_TEST_VAR", "first")
+        assert shell.run('printf %s "$JINTARO_TEST_VAR"', str(tmp_path)) == (0, "first", "")
+        monkeypatch.setenv("JINTARO_TEST_VAR", "second")
+        assert shell.run('printf %s "$JINTARO_TEST_VAR"', str(tmp_path)) == (0, "second", "")
+        monkeypatch.delenv("JINTARO_TEST_VAR")
+        assert shell.run('printf %s "${JINTARO_TEST_VAR-unset}"', str(tmp_path)) == (0, "unset", "")
+    finally:
+        shell.close()
+
+
+def test_hook_shell_passes_on_stdin(tmp_path):
+    script = ("from jintaro.jintaro import _HookShell\n"
+              "shell = _HookShell()\n"
+              "print(shell.run('read line; echo \"$line\"', '.')[1], end='')\n"
+              "print(shell.run('cat', '.')[1], end='')\n"
+              "shell.close()\n")
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", script],
+                            cwd=str(tmp_path),
+                            env=env,
+                            input="first\nsecond\nthird\n",
+                            stdout=subprocess.PIPE,
+                            universal_newlines=True,
+                            check=True)
+    assert result.stdout == "first\nsecond\nthird\n"
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from jinja2.exceptions import UndefinedError
+
+from jintaro import jintaro as jintaro_module
+from jintaro.exceptions import ConfigValueError, OutputError
+from jintaro.jintaro import Jintaro
+
+
+def test_parallel_run_stops_on_first_error(tmp_path):
+    rows = 200
+    (tmp_path / "in.csv").write_text("name\n" + "".join(f"n{i}\n" for i in range(rows)))
+    (tmp_path / "t.j2").write_text("{{ name }}")
+    config_path = tmp_path / "jintaro.yml"
+    # all rows but the first one take a while, so the failure is noticed before they are done
+    config_path.write_text("input: in.csv\ntemplate: t.j2\noutput: \"out/{{ row }}\"\njobs: 2\n"
+                           "pre_hook: \"{% if row %}sleep 0.3{% endif %}\"\n")
+    # the first row fails, because its output exists already
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    (output_dir / "0").write_text("existing")
+
+    with pytest.raises(OutputError):
+        Jintaro().config(config_path).run()
+
+    written = {path.name for path in output_dir.iterdir()} - {"0"}
+    # eight jobs are in flight with two workers, but the ones still waiting for
+    # a worker are cancelled, only the two running and three queued ones remain
+    assert len(written) <= 5
+    assert (output_dir / "0").read_text() == "existing"
+
+
+def _write_single_row_project(directory, template):
+    (directory / "in.csv").write_text("name\nalice\n")
+    (directory / "t.j2").write_text(template)
+    config_path = directory / "jintaro.yml"
+    config_path.write_text("input: in.csv\ntemplate: t.j2\noutput: out.txt\nforce: true\n")
+    return config_path
+
+
+def test_failed_render_keeps_existing_output(tmp_path):
+    config_path = _write_single_row_project(tmp_path, "{{ name }} {{ undefined_variable }}")
+    (tmp_path / "out.txt").write_text("existing")
+
+    with pytest.raises(UndefinedError):
+        Jintaro().config(config_path).run()
+
+    assert (tmp_path / "out.txt").read_text() == "existing"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["in.csv", "jintaro.yml", "out.txt", "t.j2"]
+
+
+def test_forced_render_replaces_existing_output(tmp_path):
+    config_path = _write_single_row_project(tmp_path, "Hello {{ name }}")
+    (tmp_path / "out.txt").write_text("existing")
+    (tmp_path / "out.txt").chmod(0o600)
+
+    Jintaro().config(config_path).run()
+
+    assert (tmp_path / "out.txt").read_text() == "Hello alice"
+    assert (tmp_path / "out.txt").stat().st_mode & 0o777 == 0o600
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["in.csv", "jintaro.yml", "out.txt", "t.j2"]
+
+
+def test_output_created_during_render_is_kept(tmp_path, monkeypatch):
+    config_path = _write_single_row_project(tmp_path, "Hello {{ name }}")
+    config_path.write_text("input: in.csv\ntemplate: t.j2\noutput: out.txt\n")
+    compile_template = jintaro_module.compile_template
+
+    class RacingTemplate:  #pylint: disable=too-few-public-methods
+        """Simulates another job, that creates the output while this one renders it."""
+
+        def __init__(self, source):
+            self._template = compile_template(source)
+
+        def stream(self, context):
+            (tmp_path / "out.txt").write_text("other job")
+            return self._template.stream(context)
+
+    monkeypatch.setattr(jintaro_module, "compile_template", RacingTemplate)
+
+    with pytest.raises(OutputError, match="already exists"):
+        Jintaro().config(config_path).run()
+
+    assert (tmp_path / "out.txt").read_text() == "other job"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["in.csv", "jintaro.yml", "out.txt", "t.j2"]
+
+
+def test_parallel_workers_log_like_the_main_process(tmp_path):
+    (tmp_path / "in.csv").write_text("name\nalice\nbob\n")
+    (tmp_path / "t.j2").write_text("Hello {{ name }}")
+    (tmp_path / "jintaro.yml").write_text("input: in.csv\ntemplate: t.j2\noutput: \"out/{{ name }}\"\n")
+    # spawned workers don't inherit the logging configuration, unlike forked ones
+    script = ("import multiprocessing, sys\n"
+              "from jintaro.cli import main\n"
+              "multiprocessing.set_start_method('spawn')\n"
+              "sys.argv = ['jintaro', '-c', 'jintaro.yml', '-j', '2', '-v']\n"
+              "sys.exit(main())\n")
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", script],
+                            cwd=str(tmp_path),
+                            env=env,
+                            stdout=subprocess.PIPE,
+                            universal_newlines=True,
+                            check=True)
+
+    assert "Processing dataset 1 from" in result.stdout
+    assert "Processing dataset 2 from" in result.stdout
+
+
+@pytest.mark.parametrize("count", [0, -3])
+def test_jobs_must_be_at_least_one(count):
+    with pytest.raises(ConfigValueError, match="at least 1"):
+        Jintaro().jobs(count)
@@ -0,0 +1,28 @@
+from jintaro.jinja.recursive_mapping import RecursiveMapping
+
+
+def test_popitem_returns_template_string():
+    mapping = RecursiveMapping({"x": "1", "a": "{{ x }}-a"})
+
+    assert mapping.popitem() == ("a", "{{ x }}-a")
+    assert "a" not in mapping
+    mapping["a"] = "plain"
+    assert mapping["a"] == "plain"
+
+
+def test_pop_returns_template_string():
+    mapping = RecursiveMapping({"x": "1", "a": "{{ x }}-a"})
+
+    assert mapping.pop("a") == "{{ x }}-a"
+    assert mapping.pop("a", None) is None
+
+
+def test_copy_resolves_on_its_own():
+    mapping = RecursiveMapping({"x": "1", "a": "{{ x }}-a"})
+
+    copied = mapping.copy()
+    copied["x"] = "2"
+
+    assert isinstance(copied, RecursiveMapping)
+    assert copied["a"] == "2-a"
+    assert mapping["a"] == "1-a"